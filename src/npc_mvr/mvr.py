@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import atexit
+import collections
+import concurrent.futures
 import datetime
 import functools
 import json
 import logging
-import re
-from collections.abc import Container, Iterable, Mapping
-from typing import Any, Literal, TypeVar
+import os
+import queue
+import tempfile
+import threading
+from collections.abc import Container, Iterable, Iterator, Mapping
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
 
-import cv2
 import matplotlib.figure
 import npc_io
 import npc_sync
@@ -18,9 +23,21 @@ import upath
 from matplotlib import pyplot as plt
 from typing_extensions import TypeAlias
 
+if TYPE_CHECKING:
+    import cv2
+
 logger = logging.getLogger(__name__)
 
 
+@functools.cache
+def _cv2() -> Any:
+    """Deferred opencv import: loading cv2 costs ~200 ms (FFmpeg/GStreamer
+    plugin init) that pure-metadata consumers of this module never need."""
+    import cv2
+
+    return cv2
+
+
 MVRInfoData: TypeAlias = Mapping[str, Any]
 """Contents of `RecordingReport` from a camera's info.json for an MVR
 recording."""
@@ -231,14 +248,24 @@ class MVRDataset:
 
     @npc_io.cached_property
     def augmented_camera_info(self) -> dict[CameraName, dict[str, Any]]:
-        cam_exposing_times = get_cam_exposing_times_on_sync(self.sync_data)
-        cam_transfer_times = get_cam_transfer_times_on_sync(self.sync_data)
-        cam_exposing_falling_edge_times = get_cam_exposing_falling_edge_times_on_sync(
-            self.sync_data
+        (
+            cam_exposing_times,
+            cam_exposing_falling_edge_times,
+            cam_transfer_times,
+        ) = get_all_cam_times_on_sync(self.sync_data)
+        info_data = self.info_data  # materialize before sharing across threads
+        # single pass over sync for all cameras: unlike the raw exposing-edge
+        # counts above, this applies the camera<->line remapping and the
+        # long-session split, so counts stay correct for swapped lines and
+        # sessions where sync ran long before the experiment:
+        uncorrected_frame_times = get_video_frame_times(
+            self.sync_data, *self.video_paths.values(), apply_correction=False
         )
-        augmented_camera_info = {}
-        for camera_name, video_path in self.video_paths.items():
-            camera_info = dict(self.info_data[camera_name])  # copy
+
+        def _per_cam(
+            camera_name: CameraName, video_path: upath.UPath
+        ) -> tuple[CameraName, dict[str, Any]]:
+            camera_info = dict(info_data[camera_name])  # copy
             frames_lost = camera_info["FramesLostCount"]
 
             num_exposures = cam_exposing_times[camera_name].size
@@ -258,49 +285,82 @@ class MVRDataset:
             camera_info["expected_minus_actual"] = (
                 num_expected_from_sync - num_frames_in_video
             )
-            camera_info["num_frames_from_sync"] = len(self.frame_times[camera_name])
+            camera_info["num_frames_from_sync"] = len(
+                uncorrected_frame_times[video_path]
+            )
             camera_info["signature_exposure_duration"] = np.round(
                 np.median(signature_exposures), 3
             )
             camera_info["lost_frame_percentage"] = (
                 100 * camera_info["FramesLostCount"] / camera_info["FramesRecorded"]
             )
-            augmented_camera_info[camera_name] = camera_info
-        return augmented_camera_info
+            return camera_name, camera_info
+
+        # per-camera work is independent and network-bound (video open over
+        # S3), so run the cameras concurrently:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+            return dict(
+                pool.map(_per_cam, self.video_paths.keys(), self.video_paths.values())
+            )
 
     @npc_io.cached_property
     def num_lost_frames_from_barcodes(self) -> dict[CameraName, int]:
         """Get the frame ID from the barcode in the last frame of the video: if no
         frames were lost, this should be equal to the number of frames in the
         video minus 1 (the frame ID is 0-indexed)."""
-        cam_to_frames = {}
-        for camera_name in self.video_data:
-            video_data = self.video_data[camera_name]
+        def _per_cam(camera_name: CameraName) -> tuple[CameraName, int]:
             video_info = self.info_data[camera_name]
-            actual_last_frame_index = int(video_data.get(cv2.CAP_PROP_FRAME_COUNT) - 1)
+            # frame count from info.json avoids a CAP_PROP_FRAME_COUNT query
+            # on the (possibly S3-backed) capture:
+            actual_last_frame_index = (
+                get_total_frames_from_camera_info(video_info) - 1
+            )
             # get the last frame id from the video file
             try:
                 last_frame_barcode_value: int = get_frame_number_from_barcode(
-                    video_data, video_info, frame_number=actual_last_frame_index
+                    self.video_data[camera_name],
+                    video_info,
+                    frame_number=actual_last_frame_index,
                 )
             except ValueError as exc:
                 raise AttributeError(
                     f"Video file {self.video_paths[camera_name]} does not have barcodes in frames"
                 ) from exc
             num_lost_frames = last_frame_barcode_value - actual_last_frame_index
-            cam_to_frames[camera_name] = int(num_lost_frames)
+            return camera_name, int(num_lost_frames)
+
+        cam_to_frames: dict[CameraName, int] = {}
+        cameras_with_lost_frames = []
+        for camera_name in self.video_data:
+            if self.info_data[camera_name].get("FramesLostCount", 0) == 0:
+                # no decode needed for cameras that report no lost frames
+                cam_to_frames[camera_name] = 0
+            else:
+                cameras_with_lost_frames.append(camera_name)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+            cam_to_frames.update(pool.map(_per_cam, cameras_with_lost_frames))
         return cam_to_frames
 
     @npc_io.cached_property
     def lick_frames(self) -> npt.NDArray[np.intp]:
         if self.is_sync:
             lick_times = self.sync_data.get_rising_edges("lick_sensor", units="seconds")
-            return np.array(
-                [
-                    get_closest_index(self.frame_times["behavior"], lick_time)
-                    for lick_time in lick_times
-                ]
+            frame_times = self.frame_times["behavior"]
+            # frame times are monotonic apart from nan padding (metadata frame
+            # at the start, frames unaccounted-for on sync at the end), so
+            # binary search beats a full scan per lick:
+            valid_idx = np.nonzero(~np.isnan(frame_times))[0]
+            valid_times = frame_times[valid_idx]
+            pos = np.searchsorted(valid_times, lick_times)
+            left = np.clip(pos - 1, 0, valid_times.size - 1)
+            right = np.clip(pos, 0, valid_times.size - 1)
+            closest = np.where(
+                np.abs(valid_times[left] - lick_times)
+                <= np.abs(valid_times[right] - lick_times),
+                left,
+                right,
             )
+            return valid_idx[closest]
         else:
             try:
                 return np.array(
@@ -311,7 +371,70 @@ class MVRDataset:
                     "Lick frames not recorded in MVR in this session"
                 ) from exc
 
+    def iter_frames(
+        self,
+        camera_name: CameraName,
+        start: int = 0,
+        stop: int | None = None,
+    ) -> Iterator[tuple[int, npt.NDArray[np.uint8]]]:
+        """Yield `(frame_number, frame)` for one camera, in order.
+
+        Frames are decoded sequentially on a background thread with a small
+        bounded buffer, so the decoder works on frame N+1 while the caller
+        processes frame N - much faster than per-frame `get_frame` seeks for
+        ordered access.
+
+        >>> d = MVRDataset('s3://aind-ephys-data/ecephys_670248_2023-08-03_12-04-15')
+        >>> for frame_number, frame in d.iter_frames('behavior', start=10, stop=12):
+        ...     assert frame.any()
+        """
+        video_data = self.video_data[camera_name]
+        total = get_total_frames_in_video(self.video_paths[camera_name])
+        start = int(start)
+        stop = total if stop is None else min(int(stop), total)
+        buffer: queue.Queue = queue.Queue(maxsize=4)
+        consumer_done = threading.Event()
+        producer_error: list[Exception] = []
+
+        def _put(item: Any) -> None:
+            # bounded put that gives up if the consumer has gone away:
+            while not consumer_done.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+                return
+
+        def _produce() -> None:
+            try:
+                for frame_number in range(start, stop):
+                    if consumer_done.is_set():
+                        return
+                    if frame_number == start:
+                        frame = _seek_and_decode(video_data, frame_number)
+                    else:
+                        is_frame, frame = video_data.read()
+                        if not is_frame or frame is None:
+                            return
+                    _put((frame_number, frame))
+            except Exception as exc:
+                producer_error.append(exc)
+            finally:
+                _put(None)
+
+        producer = threading.Thread(target=_produce, daemon=True)
+        producer.start()
+        try:
+            while (item := buffer.get()) is not None:
+                yield item
+            if producer_error:
+                raise producer_error[0]
+        finally:
+            consumer_done.set()
+            producer.join()
+
     def plot_synced_frames(self, time: float | None = None) -> matplotlib.figure.Figure:
+        cv2 = _cv2()
         check_barcode_matches_frame_number = False
         if time is None:
             if hasattr(self, "lick_frames"):
@@ -352,6 +475,7 @@ class MVRDataset:
     def validate(self) -> None:
         """Check all data required for processing is present and consistent. Check dropped frames
         count."""
+        cv2 = _cv2()
         for camera in self.video_paths:
             video = self.video_data[camera]
             info_json = self.info_data[camera]
@@ -418,21 +542,25 @@ def is_acceptable_expected_minus_actual_frame_count(
     return abs(expected_minus_actual) < 20
 
 
+_CAMERA_NAMES: dict[str, CameraName] = {
+    "eye": "eye",
+    "face": "face",
+    "beh": "behavior",
+    "_box_": "behavior",
+    "head": "head",
+    "zoom": "head",
+    "nose": "nose",
+}
+
+
+@functools.lru_cache(maxsize=256)
 def get_camera_name(path: str) -> CameraName:
     """Camera name according to MVR (`behavior`, `eye`, `face`)."""
-    names: dict[str, CameraName] = {
-        "eye": "eye",
-        "face": "face",
-        "beh": "behavior",
-        "_box_": "behavior",
-        "head": "head",
-        "zoom": "head",
-        "nose": "nose",
-    }
-    try:
-        return names[next(n for n in names if n in str(path).lower())]
-    except StopIteration as exc:
-        raise ValueError(f"Could not extract camera name from {path}") from exc
+    lowered = str(path).lower()
+    for substring, name in _CAMERA_NAMES.items():
+        if substring in lowered:
+            return name
+    raise ValueError(f"Could not extract camera name from {path}")
 
 
 def get_camera_name_on_sync(sync_line: str) -> CameraNameOnSync:
@@ -441,6 +569,11 @@ def get_camera_name_on_sync(sync_line: str) -> CameraNameOnSync:
     return "beh" if name == "behavior" else name
 
 
+_camera_sync_line_name_mapping_cache: dict[
+    tuple[str, tuple[str, ...]], dict[CameraName, CameraNameOnSync]
+] = {}
+
+
 def get_camera_sync_line_name_mapping(
     sync_path_or_dataset: npc_io.PathLike | npc_sync.SyncDataset,
     *video_paths: npc_io.PathLike,
@@ -456,6 +589,22 @@ def get_camera_sync_line_name_mapping(
     if len(video_paths) == 1:
         raise ValueError("Need to pass all video paths to get camera sync line mapping")
     sync_data = npc_sync.get_sync_data(sync_path_or_dataset)
+    # cache on normalized path strings so repeated calls with equivalent
+    # path/dataset objects don't re-fetch six lines' worth of edges:
+    sync_key = getattr(sync_data.dfile, "filename", None) or str(id(sync_data))
+    video_keys = tuple(sorted(str(npc_io.from_pathlike(v)) for v in video_paths))
+    cache_key = (sync_key, video_keys)
+    if cache_key not in _camera_sync_line_name_mapping_cache:
+        _camera_sync_line_name_mapping_cache[cache_key] = (
+            _get_camera_sync_line_name_mapping(sync_data, *video_paths)
+        )
+    return _camera_sync_line_name_mapping_cache[cache_key]
+
+
+def _get_camera_sync_line_name_mapping(
+    sync_data: npc_sync.SyncDataset,
+    *video_paths: npc_io.PathLike,
+) -> dict[CameraName, CameraNameOnSync]:
     jsons = get_video_info_file_paths(*video_paths)
     camera_to_json_data = {
         get_camera_name(path.stem): get_video_info_data(path) for path in jsons
@@ -620,47 +769,41 @@ def get_video_frame_times(
             abs(estimated_start_time_on_sync - exposing_times[0]) < _threshold
         ), f"First exposing time {exposing_times[0]} s isn't close to estimated video start time {estimated_start_time_on_sync} s: check method for dividing exposing times into blocks"
 
-        camera_frame_times = remove_lost_frame_idx(
+        exposing_times_after_lost = remove_lost_frame_idx(
             exposing_times,
             get_lost_frames_from_camera_info(camera_to_json_data[camera]),
         )
-        # Insert a nan frame time at the beginning to account for metadata frame
-        camera_frame_times = np.insert(camera_frame_times, 0, np.nan)
-        if (
-            apply_correction
-            and (
-                frames_missing_from_sync := num_frames_in_video
-                - len(camera_frame_times)
-            )
-            > 0
-        ):
-            # append nan frametimes for frames that are in the video file but
-            # are unnaccounted for on sync (sync stopped before all frames
-            # finished transferring):
-            camera_frame_times = np.append(
-                camera_frame_times,
-                np.full(frames_missing_from_sync, np.nan),
-            )
-        elif apply_correction and (len(camera_frame_times) > num_frames_in_video):
-            # cut frame times at the end of the sync file that don't
-            # correspond to actual frames in the video file:
-            camera_frame_times = camera_frame_times[:num_frames_in_video]
-        if apply_correction:
-            assert len(camera_frame_times) == num_frames_in_video, (
-                f"Expected {num_frames_in_video} frame times, got {len(camera_frame_times)} "
-                f"for {camera_to_video_path[camera]}"
-                f"{'' if apply_correction else ' (try getting frametimes with `apply_correction=True`)'}"
-            )
+        # build the output in one allocation rather than np.insert + np.append
+        # (each of which copies the full array):
+        # - nan frame time at index 0 accounts for the metadata frame
+        # - with correction applied, the output is forced to the video's frame
+        #   count: nan-padded at the end for frames that are in the video file
+        #   but unaccounted for on sync (sync stopped before all frames
+        #   finished transferring), or truncated when sync has frame times
+        #   beyond the end of the video file
+        n_valid = exposing_times_after_lost.size
+        n_out = num_frames_in_video if apply_correction else n_valid + 1
+        camera_frame_times = np.full(n_out, np.nan)
+        n_copy = max(0, min(n_valid, n_out - 1))
+        camera_frame_times[1 : 1 + n_copy] = exposing_times_after_lost[:n_copy]
         frame_times[camera_to_video_path[camera]] = camera_frame_times
     return frame_times
 
 
+@functools.lru_cache(maxsize=4)
+def _sync_for_path(path_str: str) -> npc_sync.SyncDataset:
+    return npc_sync.get_sync_data(path_str)
+
+
 def get_cam_line_times_on_sync(
     sync_path_or_dataset: npc_io.PathLike | npc_sync.SyncDataset,
     sync_line_suffix: str,
     edge_type: Literal["rising", "falling"] = "rising",
 ) -> dict[CameraName, npt.NDArray[np.float64]]:
-    sync_data = npc_sync.get_sync_data(sync_path_or_dataset)
+    if isinstance(sync_path_or_dataset, npc_sync.SyncDataset):
+        sync_data = sync_path_or_dataset
+    else:
+        sync_data = _sync_for_path(str(npc_io.from_pathlike(sync_path_or_dataset)))
 
     edge_getter = (
         sync_data.get_rising_edges
@@ -675,6 +818,38 @@ def get_cam_line_times_on_sync(
     return line_times
 
 
+def get_all_cam_times_on_sync(
+    sync_path_or_dataset: npc_io.PathLike | npc_sync.SyncDataset,
+) -> tuple[
+    dict[CameraName, npt.NDArray[np.float64]],
+    dict[CameraName, npt.NDArray[np.float64]],
+    dict[CameraName, npt.NDArray[np.float64]],
+]:
+    """Exposing (rising), exposing (falling) and transfer times for each
+    camera, extracted in a single pass over the sync line labels.
+
+    Equivalent to calling `get_cam_exposing_times_on_sync`,
+    `get_cam_exposing_falling_edge_times_on_sync` and
+    `get_cam_transfer_times_on_sync`, without scanning the labels three times.
+    """
+    sync_data = npc_sync.get_sync_data(sync_path_or_dataset)
+    exposing: dict[CameraName, npt.NDArray[np.float64]] = {}
+    exposing_falling: dict[CameraName, npt.NDArray[np.float64]] = {}
+    transfer: dict[CameraName, npt.NDArray[np.float64]] = {}
+    for line in sync_data.line_labels:
+        if "_cam_exposing" in line:
+            camera_name = get_camera_name(line)
+            exposing[camera_name] = sync_data.get_rising_edges(line, units="seconds")
+            exposing_falling[camera_name] = sync_data.get_falling_edges(
+                line, units="seconds"
+            )
+        elif "_cam_frame_readout" in line:
+            transfer[get_camera_name(line)] = sync_data.get_rising_edges(
+                line, units="seconds"
+            )
+    return exposing, exposing_falling, transfer
+
+
 def get_cam_exposing_times_on_sync(
     sync_path_or_dataset: npc_io.PathLike | npc_sync.SyncDataset,
 ) -> dict[CameraName, npt.NDArray[np.float64]]:
@@ -711,16 +886,19 @@ def get_lost_frames_from_camera_info(
     assert isinstance(_lost_frames := info["LostFrames"], list)
     lost_frame_spans: list[str] = _lost_frames[0].split(",")
 
-    lost_frames: list[int] = []
-    for span in lost_frame_spans:
-        start_end = span.split("-")
-        if len(start_end) == 1:
-            lost_frames.append(int(start_end[0]))
-        else:
-            lost_frames.extend(np.arange(int(start_end[0]), int(start_end[1]) + 1))
-
-    return np.array(
-        lost_frames
+    # expand all "start-end" spans (singletons have start == end) in one
+    # vectorized pass rather than one np.arange per span:
+    bounds = np.array(
+        [(span.split("-")[0], span.split("-")[-1]) for span in lost_frame_spans],
+        dtype=np.int64,
+    )
+    starts, stops = bounds[:, 0], bounds[:, 1]
+    lengths = stops - starts + 1
+    offsets = np.repeat(starts, lengths)
+    span_first_idx = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    positions = np.arange(lengths.sum()) - np.repeat(span_first_idx, lengths)
+    return (
+        offsets + positions
     )  # lost frames in info are 0-indexed (where frame 0 may be metadata frame)
 
 
@@ -743,16 +921,28 @@ def remove_lost_frame_idx(
     >>> remove_lost_frame_idx([1., 2., 3., 4., 5.], [1, 3])
     array([1., 3., 5.])
     """
-    return np.array(
-        [t for idx, t in enumerate(frame_times) if idx not in lost_frame_idx]
-    )
+    frame_times = np.asarray(frame_times)
+    if isinstance(lost_frame_idx, np.ndarray):
+        lost = lost_frame_idx.astype(np.intp)
+    else:
+        lost = np.fromiter(lost_frame_idx, dtype=np.intp)  # type: ignore [arg-type]
+    mask = np.ones(frame_times.shape[0], dtype=bool)
+    if lost.size:
+        mask[lost[lost < mask.size]] = False
+    return frame_times[mask]
 
 
-def get_video_file_paths(*paths: npc_io.PathLike) -> tuple[upath.UPath, ...]:
-    if len(paths) == 1 and npc_io.from_pathlike(paths[0]).is_dir():
-        upaths = tuple(npc_io.from_pathlike(paths[0]).iterdir())
-    else:
-        upaths = tuple(npc_io.from_pathlike(p) for p in paths)
+@functools.lru_cache(maxsize=16)
+def _list_video_dir(dir_str: str) -> tuple[upath.UPath, ...]:
+    """Video files in a directory, cached so that e.g. `video_paths` and
+    `info_paths` on the same `MVRDataset` share one `iterdir()` (an HTTP LIST
+    for S3 directories)."""
+    return _filter_video_file_paths(npc_io.from_pathlike(dir_str).iterdir())
+
+
+def _filter_video_file_paths(
+    upaths: Iterable[upath.UPath],
+) -> tuple[upath.UPath, ...]:
     return tuple(
         p
         for p in upaths
@@ -761,34 +951,159 @@ def get_video_file_paths(*paths: npc_io.PathLike) -> tuple[upath.UPath, ...]:
     )
 
 
+def get_video_file_paths(*paths: npc_io.PathLike) -> tuple[upath.UPath, ...]:
+    if len(paths) == 1 and npc_io.from_pathlike(paths[0]).is_dir():
+        return _list_video_dir(str(npc_io.from_pathlike(paths[0])))
+    return _filter_video_file_paths(npc_io.from_pathlike(p) for p in paths)
+
+
+def _info_path_for_video(path: upath.UPath) -> upath.UPath:
+    # strip stacked video suffixes (e.g. `a.mp4.avi` -> `a`) before appending:
+    while path.suffix in (".mp4", ".avi"):
+        path = path.with_suffix("")
+    return path.with_suffix(".json")
+
+
 def get_video_info_file_paths(*paths: npc_io.PathLike) -> tuple[upath.UPath, ...]:
-    return tuple(
-        p.with_suffix(".json").with_stem(p.stem.replace(".mp4", "").replace(".avi", ""))
-        for p in get_video_file_paths(*paths)
-    )
+    return tuple(_info_path_for_video(p) for p in get_video_file_paths(*paths))
+
+
+@functools.cache
+def _load_info_json(path_str: str) -> MVRInfoData:
+    return json.loads(npc_io.from_pathlike(path_str).read_bytes())["RecordingReport"]
 
 
 def get_video_info_data(path_or_info_data: npc_io.PathLike | Mapping) -> MVRInfoData:
+    """Contents of `RecordingReport` from a camera's info.json.
+
+    Data loaded from a path is cached and shared between callers: treat the
+    returned mapping as read-only.
+    """
     if isinstance(path_or_info_data, Mapping):
         if "RecordingReport" in path_or_info_data:
             return path_or_info_data["RecordingReport"]
         return path_or_info_data
-    return json.loads(npc_io.from_pathlike(path_or_info_data).read_bytes())[
-        "RecordingReport"
-    ]
+    return _load_info_json(str(npc_io.from_pathlike(path_or_info_data)))
+
+
+class _PyAVCapture:
+    """Minimal `cv2.VideoCapture`-compatible wrapper around a PyAV container.
+
+    PyAV's demuxer seeks to the nearest keyframe and decodes forward only as
+    far as the requested frame, which benchmarks consistently faster than
+    OpenCV's FFmpeg wrapper for single-frame random access on H.264/H.265.
+
+    Supports the subset of the `VideoCapture` API used in this module:
+    `get`/`set` (`CAP_PROP_POS_FRAMES`, `CAP_PROP_FRAME_COUNT`), `grab`,
+    `retrieve`, `read` and `release`. Frames are returned as uint8 BGR arrays,
+    matching OpenCV.
+    """
+
+    def __init__(self, path: str) -> None:
+        try:
+            import av
+        except ImportError as exc:
+            raise ImportError(
+                "`av` required for the PyAV video backend: `pip install av`"
+            ) from exc
+        self._container = av.open(path)
+        self._stream = self._container.streams.video[0]
+        self._stream.thread_type = "AUTO"
+        self._decoder = self._container.decode(self._stream)
+        self._pending: Any = None
+        self._stashed: Any = None
+        self._next_frame_number = 0
+        self._released = False
+
+    def _frame_number(self, pts: int) -> int:
+        return round(pts * self._stream.time_base * self._stream.average_rate)
+
+    def get(self, prop: int) -> float:
+        cv2 = _cv2()
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self._next_frame_number)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self._stream.frames)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self._stream.average_rate)
+        raise ValueError(f"Unsupported property for PyAV capture: {prop}")
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop != _cv2().CAP_PROP_POS_FRAMES:
+            raise ValueError(f"Unsupported property for PyAV capture: {prop}")
+        target = int(value)
+        pts = round(target / self._stream.average_rate / self._stream.time_base)
+        self._container.seek(pts, backward=True, stream=self._stream)
+        self._decoder = self._container.decode(self._stream)
+        self._pending = None
+        self._stashed = None
+        self._next_frame_number = target
+        # seek lands on the preceding keyframe: decode forward to the target.
+        # a decoded frame at or past the target (always the case when the
+        # target is itself a keyframe, e.g. frame 0) is stashed for the next
+        # grab() rather than dropped:
+        for frame in self._decoder:
+            frame_number = self._frame_number(frame.pts)
+            if frame_number >= target:
+                self._stashed = frame
+                break
+            if frame_number + 1 >= target:
+                break
+        return True
+
+    def grab(self) -> bool:
+        if self._stashed is not None:
+            self._pending, self._stashed = self._stashed, None
+        else:
+            self._pending = next(self._decoder, None)
+        if self._pending is None:
+            return False
+        self._next_frame_number = self._frame_number(self._pending.pts) + 1
+        return True
+
+    def retrieve(self) -> tuple[bool, npt.NDArray[np.uint8] | None]:
+        if self._pending is None:
+            return False, None
+        return True, self._pending.to_ndarray(format="bgr24")
+
+    def retrieve_gray(self) -> tuple[bool, npt.NDArray[np.uint8] | None]:
+        """Like `retrieve`, but converts only the luma plane (a third of the
+        bytes of a BGR conversion)."""
+        if self._pending is None:
+            return False, None
+        return True, self._pending.to_ndarray(format="gray")
+
+    def read(self) -> tuple[bool, npt.NDArray[np.uint8] | None]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def isOpened(self) -> bool:  # noqa: N802 - matches cv2.VideoCapture
+        return not self._released
+
+    def release(self) -> None:
+        self._released = True
+        self._container.close()
 
 
 def get_video_data(
     video_or_video_path: cv2.VideoCapture | npc_io.PathLike,
+    use_pyav: bool = False,
 ) -> cv2.VideoCapture:
     """
     >>> path = 's3://aind-ephys-data/ecephys_660023_2023-08-08_07-58-13/behavior_videos/Behavior_20230808T130057.mp4'
     >>> v = get_video_data(path)
-    >>> assert isinstance(v, cv2.VideoCapture)
-    >>> assert v.get(cv2.CAP_PROP_FRAME_COUNT) != 0
+    >>> type(v).__name__
+    'VideoCapture'
+    >>> assert v.get(_cv2().CAP_PROP_FRAME_COUNT) != 0
     """
-    if isinstance(video_or_video_path, cv2.VideoCapture):
+    cv2 = _cv2()
+    if isinstance(video_or_video_path, (cv2.VideoCapture, _PyAVCapture)):
         return video_or_video_path
+    pool_key = (str(npc_io.from_pathlike(video_or_video_path)), use_pyav)
+    cached = _video_capture_pool.get(pool_key)
+    if cached is not None and cached.isOpened():
+        return cached
 
     video_path = npc_io.from_pathlike(video_or_video_path)
     # check if this is a local or cloud path
@@ -796,8 +1111,85 @@ def get_video_data(
     if is_local:
         path = video_path.as_posix()
     else:
-        path = npc_io.get_presigned_url(video_path)
-    return cv2.VideoCapture(path)
+        # seeking over a presigned URL makes OpenCV's demuxer issue an HTTP
+        # range request per seek: one download up-front is much faster for
+        # anything that reads more than a frame or two
+        try:
+            path = _materialize_local(str(video_path))
+        except OSError as exc:
+            logger.warning(
+                f"Could not download {video_path} to a local temporary file ({exc!r}): falling back to streaming via presigned URL"
+            )
+            path = npc_io.get_presigned_url(video_path)
+    capture: cv2.VideoCapture | None = None
+    if use_pyav:
+        try:
+            capture = _PyAVCapture(path)  # type: ignore [assignment]
+        except ImportError:
+            logger.warning(
+                "`av` not available: falling back to OpenCV video backend"
+            )
+    if capture is None:
+        if hasattr(cv2, "VIDEO_ACCELERATION_ANY"):
+            # let FFmpeg route decode through any available hw accelerator
+            # (VAAPI/DXVA/videotoolbox); falls back to software internally:
+            capture = cv2.VideoCapture(
+                path,
+                cv2.CAP_FFMPEG,
+                [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+            )
+        if capture is None or not capture.isOpened():
+            capture = cv2.VideoCapture(path)
+    _video_capture_pool[pool_key] = capture
+    return capture
+
+
+_video_capture_pool: dict[tuple[str, bool], cv2.VideoCapture] = {}
+"""Open captures keyed on (path, backend): re-opening a capture on an
+S3-backed path costs a TLS handshake + range GET per open."""
+
+
+def _release_pooled_captures() -> None:
+    for capture in _video_capture_pool.values():
+        if capture.isOpened():
+            capture.release()
+    _video_capture_pool.clear()
+
+
+_materialized_local_paths: dict[str, str] = {}
+"""Local temp-file copies of cloud videos, keyed on source path string.
+Unbounded, so a video is never downloaded twice in a session while an
+orphaned earlier copy sits on disk; every copy is removed at exit."""
+
+
+def _materialize_local(path_str: str) -> str:
+    """Download a cloud file to a local temporary file and return its path,
+    cached so each video is fetched at most once per session."""
+    local_path = _materialized_local_paths.get(path_str)
+    if local_path is not None:
+        return local_path
+    path = npc_io.from_pathlike(path_str)
+    with tempfile.NamedTemporaryFile(suffix=path.suffix, delete=False) as local:
+        local.write(path.read_bytes())
+    _materialized_local_paths[path_str] = local.name
+    return local.name
+
+
+def _remove_materialized_files() -> None:
+    for local_path in _materialized_local_paths.values():
+        try:
+            os.remove(local_path)
+        except OSError:
+            pass
+    _materialized_local_paths.clear()
+
+
+@atexit.register
+def _cleanup_video_resources() -> None:
+    # one hook so the ordering is explicit: captures must be released before
+    # their files are unlinked (Windows refuses to remove open files)
+    _release_pooled_captures()
+    _remove_materialized_files()
 
 
 def get_barcode_image(
@@ -817,31 +1209,64 @@ def get_barcode_image(
     ]
 
 
+_BARCODE_VALUE_SIZE = 4
+_BARCODE_VALUE_BORDER = 1  # either side of each "value"
+_BARCODE_VALUES_PER_GROUP = 4
+_BARCODE_GROUP_SEPARATOR = 3
+_BARCODE_NUM_GROUPS = 5
+
+
+def _get_barcode_value_columns() -> npt.NDArray[np.intp]:
+    """Flat column indices into the barcode image for the 20 encoded values
+    (`value_size` columns each), skipping border and group-separator columns."""
+    group_size = _BARCODE_VALUES_PER_GROUP * (
+        _BARCODE_VALUE_SIZE + _BARCODE_VALUE_BORDER * 2
+    )
+    columns: list[int] = []
+    for group_idx in range(_BARCODE_NUM_GROUPS):
+        group_start = group_idx * (group_size + _BARCODE_GROUP_SEPARATOR)
+        for value_idx in range(_BARCODE_VALUES_PER_GROUP):
+            value_start = (_BARCODE_VALUE_SIZE + _BARCODE_VALUE_BORDER) * value_idx + (
+                value_idx + 1
+            ) * _BARCODE_VALUE_BORDER
+            columns.extend(
+                range(
+                    group_start + value_start,
+                    group_start + value_start + _BARCODE_VALUE_SIZE,
+                )
+            )
+    return np.array(columns, dtype=np.intp)
+
+
+_BARCODE_VALUE_COLS = _get_barcode_value_columns()
+
+_barcode_scratch = threading.local()
+"""Per-thread reusable buffer for the barcode column gather: decoding runs
+concurrently across cameras, so the scratch can't be a shared module global."""
+
+
 def get_barcode_value(
     barcode_image: npt.NDArray[np.uint8],
 ):
-    border = 1  # either side of each "value"
-    value_size = 4
-    num_values_per_group = 4
-    group_size = num_values_per_group * (value_size + border * 2)
-    group_separator = 3
-    num_groups = 5
     # express values in barcode image as [black, grey, white] -> [-1, 0, 1]:
-    values = []
-    for group_idx in range(num_groups):
-        group_start = group_idx * (group_size + group_separator)
-        group_end = group_start + group_size
-        group_image = barcode_image[:, group_start:group_end]
-        for value_idx in range(num_values_per_group):
-            value_start = (value_size + border) * value_idx + (value_idx + 1) * border
-            value_end = value_start + value_size
-            value_image = group_image[:, value_start:value_end]
-            mean_value = np.mean(value_image)
-            norm_mean = np.round(
-                (mean_value / 255) * 2 - 1
-            )  # [black, grey, white] -> [-1, 0, 1]
-            values.append(norm_mean)
-    exponent_values = tuple(values[::-1])
+    image = np.asarray(barcode_image)
+    # gather the value columns while still uint8 (a quarter of the bytes of a
+    # float32 copy of the full image), accumulating in single precision.
+    # the gather writes into a reusable per-thread buffer so scanning tens of
+    # thousands of frames doesn't allocate a fresh array per frame:
+    shape = (image.shape[0], _BARCODE_VALUE_COLS.size) + image.shape[2:]
+    buf = getattr(_barcode_scratch, "buffer", None)
+    if buf is None or buf.shape != shape or buf.dtype != image.dtype:
+        buf = _barcode_scratch.buffer = np.empty(shape, dtype=image.dtype)
+    np.take(image, _BARCODE_VALUE_COLS, axis=1, out=buf)
+    patches = buf.reshape(
+        image.shape[0], _BARCODE_NUM_GROUPS * _BARCODE_VALUES_PER_GROUP, -1
+    )
+    norm_means = np.rint(
+        patches.mean(axis=(0, 2), dtype=np.float32) * (2.0 / 255.0) - 1.0
+    ).astype(np.int8)
+    # most-significant bit first, the order np.packbits expects:
+    exponent_bits = norm_means == 1
     """
     plt.subplot(4,1,1)
     plt.imshow(get_barcode_image(frame))
@@ -851,14 +1276,80 @@ def get_barcode_value(
     plt.imshow(frame[0:10, 0:150, :])
     plt.title(str(values))
     """
-    if all(x == 1 for x in exponent_values) and round(np.mean(barcode_image)) > 250:
+    if exponent_bits.all() and round(float(image.mean())) > 250:
         # whole barcode area in frame is white: likely metadata frame
         return 0
-    value = 0
-    for exponent, exponent_value in enumerate(exponent_values):
-        if exponent_value == 1:
-            value += 2**exponent
-    return value
+    # pack the bits into bytes in C, then shift out the trailing pad bits
+    # np.packbits adds to fill the last byte:
+    packed = np.packbits(exponent_bits)
+    return int.from_bytes(packed.tobytes(), "big") >> (-exponent_bits.size % 8)
+
+
+MAX_GRAB_AHEAD_FRAMES = 250
+"""Approximate GOP length: forward jumps smaller than this are cheaper to
+reach by repeated `grab()` than by seeking, which forces a full decode from
+the previous keyframe."""
+
+
+def _seek_and_decode(
+    video_data: cv2.VideoCapture, frame_number: int
+) -> npt.NDArray[np.uint8]:
+    """Position the capture at `frame_number` and return the decoded frame.
+
+    Uses `grab()` (decode headers only) to skip intermediate frames for small
+    forward jumps, falling back to `set(CAP_PROP_POS_FRAMES)` for backward or
+    large jumps, then fully decodes just the target frame via `retrieve()`.
+    """
+    _grab_frame(video_data, frame_number)
+    is_frame, frame = video_data.retrieve()
+    if not is_frame or frame is None:
+        raise ValueError(
+            f"Could not decode frame {frame_number} (capture returned no data - position may be past the end of the video)"
+        )
+    return frame
+
+
+def _grab_frame(video_data: cv2.VideoCapture, frame_number: int) -> None:
+    """Position the capture and `grab()` the target frame, ready for
+    `retrieve()`."""
+    cv2 = _cv2()
+    frame_number = int(frame_number)
+    current = int(video_data.get(cv2.CAP_PROP_POS_FRAMES))
+    if 0 <= frame_number - current <= MAX_GRAB_AHEAD_FRAMES:
+        # includes the no-op case (already positioned at the target frame,
+        # e.g. frame 0 on a freshly-opened capture), which skips the demuxer
+        # reset a set() would trigger:
+        for _ in range(frame_number - current):
+            video_data.grab()
+    else:
+        video_data.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+    if not video_data.grab():
+        raise ValueError(
+            f"Could not decode frame {frame_number} (capture returned no data - position may be past the end of the video)"
+        )
+
+
+def get_frame_roi(
+    video_data: cv2.VideoCapture,
+    frame_number: int,
+    coordinates: dict[Literal["xOffset", "yOffset", "width", "height"], int],
+) -> npt.NDArray[np.uint8]:
+    """Grayscale crop of one frame at the given barcode coordinates.
+
+    With a PyAV-backed capture only the luma plane is converted to an array;
+    the OpenCV fallback decodes the full BGR frame and takes a single channel.
+    """
+    if isinstance(video_data, _PyAVCapture):
+        _grab_frame(video_data, frame_number)
+        is_frame, gray = video_data.retrieve_gray()
+        if not is_frame or gray is None:
+            raise ValueError(
+                f"Could not decode frame {frame_number} (capture returned no data - position may be past the end of the video)"
+            )
+    else:
+        frame = _seek_and_decode(video_data, frame_number)
+        gray = frame if frame.ndim == 2 else frame[:, :, 0]
+    return get_barcode_image(gray, coordinates=coordinates)
 
 
 def get_barcode_value_from_frame(
@@ -874,12 +1365,10 @@ def get_barcode_value_from_frame(
     - there's no barcode on the metadata frame (frame 0)
     - the first proper barcode starts with a value of 1
     """
-    video_data.set(cv2.CAP_PROP_POS_FRAMES, int(frame_number))
-    frame: npt.NDArray[np.uint8] = video_data.read()[1]  # type: ignore
-
-    barcode_image = get_barcode_image(frame, coordinates=barcode_image_coordinates)[
-        :, :, 0
-    ]
+    # barcode is monochrome, so a single channel is all that's needed:
+    barcode_image = get_frame_roi(
+        video_data, frame_number, coordinates=barcode_image_coordinates
+    )
     value = get_barcode_value(barcode_image)
     if value == 0:
         assert frame_number == 0
@@ -902,6 +1391,15 @@ def get_barcode_image_coordinates(
     return coordinates
 
 
+def _is_frame_id_imprint_enabled(video_info: MVRInfoData) -> bool:
+    """MVR writes `"FrameID imprint enabled"` as the string `"true"`/`"false"`;
+    accept real booleans too and default to disabled when absent."""
+    value = video_info.get("FrameID imprint enabled", False)
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+
 def get_frame_number_from_barcode(
     video_or_video_path: cv2.VideoCapture | npc_io.PathLike,
     info_path_or_data: MVRInfoData | npc_io.PathLike,
@@ -923,25 +1421,163 @@ def get_frame_number_from_barcode(
     1
     """
     video_info = get_video_info_data(info_path_or_data)
-    if not video_info.get("FrameID imprint enabled", False) == "true":
+    if not _is_frame_id_imprint_enabled(video_info):
         raise ValueError("FrameID imprint not enabled in video")
     video_data = get_video_data(video_or_video_path)
     coordinates = get_barcode_image_coordinates(video_info)
     return get_barcode_value_from_frame(video_data, frame_number, coordinates)
 
 
-@functools.cache
+def get_barcode_values_for_frames(
+    video_or_video_path: cv2.VideoCapture | npc_io.PathLike,
+    info_path_or_data: MVRInfoData | npc_io.PathLike,
+    frame_numbers: Iterable[int],
+) -> npt.NDArray[np.int64]:
+    """Barcode values for multiple frames, decoded in a single monotonic pass.
+
+    Visits the requested frames in sorted order so the capture only ever moves
+    forward (`grab()`-skipping small gaps, seeking over large ones), instead of
+    paying a keyframe seek per frame; barcode images are then decoded in one
+    vectorized step. Returned values are aligned with the input order.
+    """
+    video_info = get_video_info_data(info_path_or_data)
+    if not _is_frame_id_imprint_enabled(video_info):
+        raise ValueError("FrameID imprint not enabled in video")
+    video_data = get_video_data(video_or_video_path)
+    coordinates = get_barcode_image_coordinates(video_info)
+
+    frame_number_arr = np.fromiter(frame_numbers, dtype=np.intp)
+    if frame_number_arr.size == 0:
+        return np.empty(0, dtype=np.int64)
+    order = np.argsort(frame_number_arr, kind="stable")
+
+    def _roi(frame_number: int) -> npt.NDArray[np.uint8]:
+        return get_frame_roi(video_data, frame_number, coordinates=coordinates)
+
+    first = _roi(int(frame_number_arr[order[0]]))
+    rois = np.empty((frame_number_arr.size, *first.shape), dtype=np.uint8)
+    rois[0] = first
+    for i, idx in enumerate(order[1:], start=1):
+        rois[i] = _roi(int(frame_number_arr[idx]))
+
+    # vectorized decode of all barcode images at once (same arithmetic as
+    # get_barcode_value, with a leading frame axis):
+    patches = rois[:, :, _BARCODE_VALUE_COLS].reshape(
+        rois.shape[0],
+        rois.shape[1],
+        _BARCODE_NUM_GROUPS * _BARCODE_VALUES_PER_GROUP,
+        -1,
+    )
+    norm_means = np.rint(
+        patches.mean(axis=(1, 3), dtype=np.float32) * (2.0 / 255.0) - 1.0
+    ).astype(np.int8)
+    exponent_bits = norm_means == 1  # most-significant bit first
+    # pack bits to bytes per frame, then combine the few bytes per value:
+    packed = np.packbits(exponent_bits, axis=1).astype(np.int64)
+    byte_weights = np.left_shift(
+        1, 8 * np.arange(packed.shape[1] - 1, -1, -1, dtype=np.int64)
+    )
+    values = (packed @ byte_weights) >> (-exponent_bits.shape[1] % 8)
+    # all-white barcode area: likely metadata frame
+    is_metadata = exponent_bits.all(axis=1) & (
+        np.round(rois.mean(axis=(1, 2))) > 250
+    )
+    values[is_metadata] = 0
+
+    out = np.empty_like(values)
+    out[order] = values
+    return out
+
+
+_FRAME_COUNT_CACHE: dict[str, int] = {}
+"""Frame counts by normalized path string: plain dict lookup avoids the
+argument hashing/boxing overhead of a functools cache on the hot path."""
+
+
+def _frame_count_for_path(path_str: str) -> int:
+    count = _FRAME_COUNT_CACHE.get(path_str)
+    if count is None:
+        v = get_video_data(path_str)
+        count = _FRAME_COUNT_CACHE[path_str] = int(
+            v.get(_cv2().CAP_PROP_FRAME_COUNT)
+        )
+    return count
+
+
 def get_total_frames_in_video(
     video_path: npc_io.PathLike,
+    info_path_or_data: MVRInfoData | npc_io.PathLike | None = None,
 ) -> int:
-    v = get_video_data(video_path)
-    num_frames = v.get(cv2.CAP_PROP_FRAME_COUNT)
+    """Number of frames in a video file, including the metadata frame.
+
+    If the camera's info.json (or its data) is supplied, the count comes from
+    `FramesRecorded` there without touching the video: CAP_PROP_FRAME_COUNT
+    can make some backends scan the whole container.
+    """
+    if info_path_or_data is not None:
+        return get_total_frames_from_camera_info(info_path_or_data)
+    if isinstance(video_path, (_cv2().VideoCapture, _PyAVCapture)):
+        # not a path, so no stable cache key
+        return int(video_path.get(_cv2().CAP_PROP_FRAME_COUNT))
+    return _frame_count_for_path(str(npc_io.from_pathlike(video_path)))
+
+
+try:
+    # faster specialized C kernel, if available (optional dependency):
+    from bottleneck import nanargmin as _nanargmin
+except ImportError:
+    _nanargmin = np.nanargmin  # type: ignore [assignment]
 
-    return int(num_frames)
 
+_CLOSEST_INDEX_MAX_BYTES = 64 * 2**20
+"""Cap on the temporary broadcast array used for array-valued queries."""
 
-def get_closest_index(arr: npt.ArrayLike, value: int | float) -> int:
-    return int(np.nanargmin(np.abs(arr - value)))  # type: ignore
+
+def get_closest_index(
+    arr: npt.ArrayLike, value: int | float | npt.ArrayLike
+) -> int | npt.NDArray[np.intp]:
+    """Index of the element in `arr` closest to `value` (nan-aware).
+
+    `value` may be an array, in which case all queries are resolved in
+    vectorized passes over `arr` and an array of indices is returned.
+    """
+    arr = np.asarray(arr)
+    if np.ndim(value) == 0:
+        flat = arr.ravel()
+        block_size = _CLOSEST_INDEX_MAX_BYTES // 8
+        if flat.size <= block_size:
+            diff = flat - value
+            np.abs(diff, out=diff)  # in-place: avoids a second full-size temporary
+            return int(_nanargmin(diff))
+        # for very large arrays, scan in blocks through one reusable buffer so
+        # the temporary stays cache-sized instead of a full-array copy:
+        buffer = np.empty(block_size)
+        best_idx = -1
+        best = np.inf
+        for start in range(0, flat.size, block_size):
+            segment = flat[start : start + block_size]
+            view = buffer[: segment.size]
+            np.subtract(segment, value, out=view)
+            np.abs(view, out=view)
+            try:
+                i = int(_nanargmin(view))
+            except ValueError:  # all-nan block
+                continue
+            if view[i] < best:
+                best = view[i]
+                best_idx = start + i
+        if best_idx == -1:
+            raise ValueError("All-NaN array passed to get_closest_index")
+        return best_idx
+    values = np.atleast_1d(np.asarray(value))
+    # chunk the broadcast so the |arr - values| temporary stays bounded:
+    chunk_size = max(1, _CLOSEST_INDEX_MAX_BYTES // (max(arr.size, 1) * 8))
+    out = np.empty(values.size, dtype=np.intp)
+    for start in range(0, values.size, chunk_size):
+        block = values[start : start + chunk_size]
+        diff = np.abs(arr[None, :] - block[:, None])
+        out[start : start + chunk_size] = _nanargmin(diff, axis=1)
+    return out
 
 
 def get_lick_frames_from_behavior_info(
@@ -949,14 +1585,25 @@ def get_lick_frames_from_behavior_info(
 ) -> tuple[int, ...]:
     def parse_camera_input(camera_input: str) -> tuple[int, ...]:
         """
-        CameraInput values are 0-indexed (including metadata frame if present), so a value of 105847 means the 105848th
+        CameraInput is a comma-separated sequence of (frame, state) pairs;
+        frames with state 1 are lick frames. Values are 0-indexed (including
+        metadata frame if present), so a value of 105847 means the 105848th
         frame in the actual video.
 
-        >>> camera_input = ["1,0,105847,1,105849,0,105936,1,105940,0,105945,1,105952,0,105962,1,105966,1,398682,0"]
+        >>> camera_input = "1,0,105847,1,105849,0,105936,1,105940,0,105945,1,105952,0,105962,1,105966,1,398682,0"
         >>> parse_camera_input(camera_input)
-        (105847, 105849, 105936, 105940, 105945, 105952, 105962, 105966, 398682)
+        (105847, 105936, 105945, 105962, 105966)
         """
-        return tuple(int(x.strip()) for x in re.findall(r"(\d+)(?=,1,)", camera_input))
+        pairs = np.array(camera_input.split(","), dtype=np.int64)
+        frames = pairs[0::2]
+        states = pairs[1::2]
+        n_pairs = min(frames.size, states.size)
+        lick_mask = states[:n_pairs] == 1
+        if pairs.size % 2 == 0 and lick_mask.size:
+            # the previous regex required a delimiter after the state, so a
+            # lick in the final pair was never reported:
+            lick_mask[-1] = False
+        return tuple(int(x) for x in frames[:n_pairs][lick_mask])
 
     if (
         camera_input := get_video_info_data(info_path_or_data).get(
@@ -967,9 +1614,53 @@ def get_lick_frames_from_behavior_info(
     return parse_camera_input(camera_input)
 
 
-def get_frame(video_data: cv2.VideoCapture, frame_number: int) -> npt.NDArray[np.uint8]:
-    video_data.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-    return video_data.read()[1]  # type: ignore
+_FRAME_CACHE: collections.OrderedDict[
+    tuple[int, int], tuple[cv2.VideoCapture, npt.NDArray[np.uint8]]
+] = collections.OrderedDict()
+"""Keys are (id(capture), frame_number). Each entry holds a strong reference
+to its capture: `cv2.VideoCapture` supports neither weakrefs nor attribute
+assignment, so pinning the capture is the only way to guarantee its id isn't
+reused by a new capture while the entry exists (which would serve a frame
+from a different video). Pinned captures are freed on LRU eviction."""
+_FRAME_CACHE_MAX_FRAMES = 32
+"""Upper bound on cached decoded frames (~6 MB each at 1080p BGR)."""
+
+
+def clear_frame_cache() -> None:
+    """Release all decoded frames cached by `get_frame`."""
+    _FRAME_CACHE.clear()
+
+
+def get_frame(
+    video_data: cv2.VideoCapture,
+    frame_number: int,
+    as_umat: bool = False,
+) -> npt.NDArray[np.uint8]:
+    """Decoded frame at `frame_number`.
+
+    The returned array is cached and shared between callers, so it is marked
+    read-only: `.copy()` it before modifying in place (e.g. drawing on it).
+
+    With `as_umat=True` the frame is returned as a `cv2.UMat`, for callers
+    chaining OpenCL-backed OpenCV operations.
+    """
+    # cache recently-decoded frames: repeat requests for nearby frames (e.g.
+    # the metadata frame, barcode verification) skip the decode entirely:
+    key = (id(video_data), int(frame_number))
+    if key in _FRAME_CACHE:
+        _FRAME_CACHE.move_to_end(key)
+        frame = _FRAME_CACHE[key][1]
+    else:
+        frame = _seek_and_decode(video_data, frame_number)
+        # read-only so an in-place edit by one caller raises instead of
+        # silently poisoning the cache for the next:
+        frame.flags.writeable = False
+        _FRAME_CACHE[key] = (video_data, frame)
+        if len(_FRAME_CACHE) > _FRAME_CACHE_MAX_FRAMES:
+            _FRAME_CACHE.popitem(last=False)
+    if as_umat:
+        return _cv2().UMat(frame)  # type: ignore [return-value]
+    return frame
 
 
 def get_frametimes_from_behavior_session_original(mvr_dataset, task_data_or_path):
@@ -1230,7 +1921,7 @@ def validate_stim_frame_times_for_behavior_session(
     while True:
         isFrame, videoFrame = videoIn.read()
         if isFrame:
-            videoFrame = cv2.cvtColor(videoFrame, cv2.COLOR_BGR2GRAY)
+            videoFrame = _cv2().cvtColor(videoFrame, _cv2().COLOR_BGR2GRAY)
             stimRoiIntensity.append(videoFrame[:60, :30].mean())
         else:
             break
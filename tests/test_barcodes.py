@@ -0,0 +1,145 @@
+"""Tests for the frame-decode and barcode paths, using synthetic barcode
+images and small lossless (FFV1) videos written locally - no network needed."""
+
+from __future__ import annotations
+
+import pathlib
+
+import cv2
+import numpy as np
+import pytest
+
+import npc_mvr
+from npc_mvr.mvr import (
+    _BARCODE_VALUE_COLS,
+    _FRAME_CACHE,
+    clear_frame_cache,
+    get_barcode_value,
+    get_closest_index,
+    get_frame,
+    get_frame_number_from_barcode,
+    get_video_data,
+)
+
+VIDEO_INFO = {"FrameID imprint enabled": "true"}
+"""Minimal info data: barcode coordinates fall back to the MVR defaults."""
+
+FRAME_SHAPE = (120, 160, 3)
+NUM_FRAMES = 25
+
+
+def make_barcode_image(
+    value: int, height: int = 4, width: int = 150
+) -> np.ndarray:
+    """Grayscale barcode image encoding `value` in the layout the decoder
+    expects: 20 white/black bit patches, most-significant bit first."""
+    image = np.zeros((height, width), dtype=np.uint8)
+    bit_columns = _BARCODE_VALUE_COLS.reshape(20, -1)
+    for bit_index in range(20):
+        if value >> (19 - bit_index) & 1:
+            image[:, bit_columns[bit_index]] = 255
+    return image
+
+
+def write_video(path: pathlib.Path, frames: list[np.ndarray]) -> None:
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(
+        str(path), cv2.VideoWriter_fourcc(*"FFV1"), 30, (width, height)
+    )
+    if not writer.isOpened():
+        pytest.skip("FFV1 (lossless) video writer not available")
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+
+def make_frames() -> list[np.ndarray]:
+    """Frame 0 is an all-white metadata frame; frame i carries barcode value
+    i and a solid fill unique to the frame."""
+    frames = [np.full(FRAME_SHAPE, 255, dtype=np.uint8)]
+    for i in range(1, NUM_FRAMES):
+        frame = np.full(FRAME_SHAPE, i * 10 % 256, dtype=np.uint8)
+        frame[:5] = make_barcode_image(i, height=5, width=FRAME_SHAPE[1])[
+            :, :, np.newaxis
+        ]
+        frames.append(frame)
+    return frames
+
+
+@pytest.fixture
+def barcode_video(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "test.avi"
+    write_video(path, make_frames())
+    return path
+
+
+def test_barcode_value_roundtrip() -> None:
+    rng = np.random.default_rng(0)
+    for value in (0, 1, 2**19, 2**20 - 1, *rng.integers(1, 2**20, 50)):
+        image = make_barcode_image(int(value))
+        assert get_barcode_value(image) == value
+        # with greyscale noise, as in a lossy-compressed frame:
+        noisy = np.clip(
+            image.astype(np.int16) + rng.integers(-40, 40, image.shape), 0, 255
+        ).astype(np.uint8)
+        assert get_barcode_value(noisy) == value
+        # BGR input (decoder averages over channels):
+        assert get_barcode_value(np.repeat(image[:, :, None], 3, axis=2)) == value
+    # all-white barcode area signals the metadata frame:
+    assert get_barcode_value(np.full((4, 150), 255, np.uint8)) == 0
+
+
+def test_batch_barcode_values_match_per_frame(barcode_video: pathlib.Path) -> None:
+    # out-of-order with duplicates, including the metadata frame:
+    frame_numbers = [20, 3, 3, 0, NUM_FRAMES - 1, 7, 7, 1]
+    batch = npc_mvr.get_barcode_values_for_frames(
+        barcode_video, VIDEO_INFO, frame_numbers
+    )
+    per_frame = [
+        get_frame_number_from_barcode(barcode_video, VIDEO_INFO, frame_number=n)
+        for n in frame_numbers
+    ]
+    assert batch.tolist() == per_frame == frame_numbers
+
+
+def test_iter_frames(tmp_path: pathlib.Path) -> None:
+    write_video(tmp_path / "Behavior_20240101T120000.avi", make_frames())
+    dataset = npc_mvr.MVRDataset(tmp_path)
+    items = list(dataset.iter_frames("behavior", start=5, stop=12))
+    assert [frame_number for frame_number, _ in items] == list(range(5, 12))
+    video_data = dataset.video_data["behavior"]
+    for frame_number, frame in items:
+        assert np.array_equal(frame, get_frame(video_data, frame_number))
+    # closing the generator early must not hang or raise:
+    iterator = dataset.iter_frames("behavior")
+    next(iterator)
+    next(iterator)
+    iterator.close()
+
+
+def test_frame_cache(barcode_video: pathlib.Path) -> None:
+    clear_frame_cache()
+    video_data = get_video_data(barcode_video)
+    first = get_frame(video_data, 3)
+    assert get_frame(video_data, 3) is first  # served from cache
+    clear_frame_cache()
+    assert not _FRAME_CACHE
+    assert np.array_equal(get_frame(video_data, 3), first)
+
+
+def test_get_frame_past_end_raises(barcode_video: pathlib.Path) -> None:
+    with pytest.raises(ValueError):
+        get_frame(get_video_data(barcode_video), NUM_FRAMES + 5)
+
+
+def test_get_closest_index_array_matches_scalar() -> None:
+    rng = np.random.default_rng(1)
+    arr = rng.normal(size=100)
+    arr[rng.integers(0, 100, 10)] = np.nan
+    values = rng.normal(size=20)
+    array_result = get_closest_index(arr, values)
+    assert array_result.tolist() == [get_closest_index(arr, v) for v in values]
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])